@@ -7,6 +7,7 @@ in the appropriate sources/ subdirectory.
 """
 from datetime import datetime
 from pathlib import Path
+import hashlib
 import sqlite3
 import sys
 
@@ -15,36 +16,69 @@ from airflow.sdk import dag, task
 
 # Add utils to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.warehouse import ensure_warehouse_exists, load_csv_to_raw
+from utils.warehouse import (
+    ensure_warehouse_exists,
+    load_csv_to_raw,
+    load_parquet_to_raw,
+    validate_table_name,
+)
 
 # Paths
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 MANIFEST_PATH = PROJECT_ROOT / "sources" / "sources.yml"
 
+# libyaml's C loader when PyYAML was built with it, else the pure-Python one
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Pool that gates concurrent load tasks. DuckDB allows a single writer process
+# per database file, so setup.sh and `just ingest` create it with one slot;
+# each load already parallelizes across cores inside DuckDB's CSV reader.
+INGEST_POOL = "ingest_csv"
+
 
 def _load_manifest() -> list[dict]:
     """Read and return the sources manifest."""
-    with open(MANIFEST_PATH) as f:
-        manifest = yaml.safe_load(f)
+    manifest = yaml.load(MANIFEST_PATH.read_bytes(), Loader=_YamlLoader)
     return manifest["sources"]
 
 
 _sources = _load_manifest()
 _all_systems = sorted(set(s["system"] for s in _sources))
 
-# Validate no duplicate table names
-_tables = [s["table"] for s in _sources]
+# Validate table names are safe identifiers and not duplicated
+_tables = [validate_table_name(s["table"]) for s in _sources]
 if len(_tables) != len(set(_tables)):
     raise ValueError(f"Duplicate table names in {MANIFEST_PATH}: {_tables}")
 
+_SUPPORTED_FORMATS = {"csv", "parquet"}
+for _s in _sources:
+    if _s.get("format", "csv") not in _SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported format {_s['format']!r} for {_s['table']} in {MANIFEST_PATH}")
+
 
 def _make_load_task(source_entry: dict):
     """Factory to create a load task for a manifest entry."""
 
-    @task(task_id=f"load_{source_entry['table']}")
+    @task(task_id=f"load_{source_entry['table']}", pool=INGEST_POOL, pool_slots=1)
     def load_source(warehouse_path: str):
-        csv_path = str(PROJECT_ROOT / source_entry["path"])
-        return load_csv_to_raw(warehouse_path, csv_path, source_entry["table"])
+        # A path may be a single file, a glob, or a list of files for one table
+        path = source_entry["path"]
+        if isinstance(path, list):
+            source_path = [str(PROJECT_ROOT / p) for p in path]
+        else:
+            source_path = str(PROJECT_ROOT / path)
+        match source_entry.get("format", "csv"):
+            case "parquet":
+                return load_parquet_to_raw(warehouse_path, source_path, source_entry["table"])
+            case _:
+                return load_csv_to_raw(
+                    warehouse_path,
+                    source_path,
+                    source_entry["table"],
+                    columns=source_entry.get("columns"),
+                    delim=source_entry.get("delim"),
+                    header=source_entry.get("header"),
+                )
 
     return load_source
 
@@ -68,19 +102,35 @@ def ingest_sources():
 dag_instance = ingest_sources()
 
 if __name__ == "__main__":
-    # TODO: Optimization - only clear cache when manifest has changed (e.g., track
-    # manifest hash and compare). Currently clears on every run for simplicity.
-    # Clear stale DAG serialization to ensure test uses current manifest
-    db_path = Path(__file__).parent.parent / "airflow.db"
-    if db_path.exists():
+    # Clear stale DAG serialization so the test uses the current DAG, but only
+    # when the manifest, this file or the warehouse loaders changed since the
+    # last run
+    digest = hashlib.sha256()
+    for path in (
+        MANIFEST_PATH,
+        Path(__file__),
+        Path(__file__).parent.parent / "utils" / "warehouse.py",
+    ):
+        digest.update(path.read_bytes())
+    dag_hash = digest.hexdigest()
+    hash_path = PROJECT_ROOT / ".sources_manifest.sha256"
+    last_hash = hash_path.read_text().strip() if hash_path.exists() else None
+
+    if dag_hash != last_hash:
+        db_path = Path(__file__).parent.parent / "airflow.db"
         try:
-            conn = sqlite3.connect(db_path)
-            conn.execute("DELETE FROM serialized_dag WHERE dag_id = 'ingest_sources'")
-            conn.execute("DELETE FROM dag_version WHERE dag_id = 'ingest_sources'")
-            conn.commit()
-            conn.close()
+            if db_path.exists():
+                conn = sqlite3.connect(db_path, isolation_level=None)
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    conn.execute("DELETE FROM serialized_dag WHERE dag_id = 'ingest_sources'")
+                    conn.execute("DELETE FROM dag_version WHERE dag_id = 'ingest_sources'")
+                    conn.execute("COMMIT")
+                finally:
+                    conn.close()
+            hash_path.write_text(dag_hash + "\n")
         except sqlite3.Error:
-            pass  # Tables might not exist yet
+            pass  # Tables might not exist yet; retry on the next run
 
     print("Testing ingest_sources DAG...")
     dag_instance.test()
@@ -2,54 +2,152 @@
 Shared utilities for DuckDB warehouse operations.
 """
 from pathlib import Path
+import re
 import duckdb
+import psutil
 from airflow.sdk import task
 
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 WAREHOUSE_PATH = PROJECT_ROOT / "warehouse" / "data.duckdb"
 
+_TABLE_NAME_RE = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*")
+
+# One connection per warehouse file, shared by every load in this process
+_connections: dict[str, duckdb.DuckDBPyConnection] = {}
+
+
+def get_connection(warehouse_path: str) -> duckdb.DuckDBPyConnection:
+    """Return the process-wide DuckDB connection for a warehouse file.
+
+    Loads don't need rows kept in file order, so insertion order is
+    disabled to let DuckDB stream row groups to disk as they are written.
+    Memory is capped at half of what is currently available, since the
+    connection lives across many loads.
+    """
+    conn = _connections.get(warehouse_path)
+    if conn is None:
+        conn = duckdb.connect(warehouse_path, config={"preserve_insertion_order": False})
+        memory_limit_mb = int(psutil.virtual_memory().available * 0.5) // (1024 * 1024)
+        conn.execute(f"SET memory_limit = '{memory_limit_mb}MB'")
+        _connections[warehouse_path] = conn
+    return conn
+
+
+def validate_table_name(table_name: str) -> str:
+    """Return table_name unchanged if it is a safe bare SQL identifier."""
+    if not _TABLE_NAME_RE.fullmatch(table_name):
+        raise ValueError(f"Invalid raw table name: {table_name!r}")
+    return table_name
+
 
 @task()
 def ensure_warehouse_exists():
     """Ensure the DuckDB warehouse database exists and has required schemas."""
     print(f"Ensuring warehouse exists at {WAREHOUSE_PATH}")
-    
+
     # Create warehouse directory if it doesn't exist
     WAREHOUSE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    
+
     # Connect to DuckDB (creates file if it doesn't exist)
-    conn = duckdb.connect(str(WAREHOUSE_PATH))
-    
+    conn = get_connection(str(WAREHOUSE_PATH))
+
     # Create schemas
     conn.execute("CREATE SCHEMA IF NOT EXISTS raw")
     conn.execute("CREATE SCHEMA IF NOT EXISTS staging")
     conn.execute("CREATE SCHEMA IF NOT EXISTS marts")
-    
+
     # Verify
     schemas = conn.execute("SELECT schema_name FROM information_schema.schemata WHERE schema_name IN ('raw', 'staging', 'marts')").fetchall()
     print(f"✓ Warehouse initialized with schemas: {[s[0] for s in schemas]}")
-    
-    conn.close()
+
     return str(WAREHOUSE_PATH)
 
 
-def load_csv_to_raw(warehouse_path: str, csv_path: str, table_name: str) -> int:
-    """Load a CSV file into a raw.* table in the DuckDB warehouse.
+def _create_raw_table(
+    warehouse_path: str,
+    table_name: str,
+    select_sql: str,
+    params: list | None = None,
+) -> int:
+    """Create or replace raw.<table_name> from a SELECT, returning its row count."""
+    validate_table_name(table_name)
+    conn = get_connection(warehouse_path)
+    conn.execute("BEGIN")
+    try:
+        conn.execute(
+            f"CREATE OR REPLACE TABLE raw.{table_name} AS {select_sql}",
+            params or [],
+        )
+        count = conn.execute(f"SELECT COUNT(*) FROM raw.{table_name}").fetchone()[0]
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    # read_csv holds on to buffers between files; flush them to the database file
+    conn.execute("CHECKPOINT")
+    print(f"Loaded {count} records into raw.{table_name}")
+    return count
+
+
+def load_csv_to_raw(
+    warehouse_path: str,
+    csv_path: str | list[str],
+    table_name: str,
+    columns: dict[str, str] | None = None,
+    delim: str | None = None,
+    header: bool | None = None,
+) -> int:
+    """Load a CSV file (or several) into a raw.* table in the DuckDB warehouse.
 
     This is a plain function (not an Airflow task) so it can be called
-    from DAGs, scripts, or agents.
+    from DAGs, scripts, or agents. Loads reuse the shared connection from
+    get_connection() and run inside an explicit transaction.
+
+    When ``columns`` (and optionally ``delim``/``header``) are given, DuckDB
+    skips type sniffing and reads the file with the parallel CSV reader.
+    Any option left as None falls back to auto-detection. The CSV path and
+    options are bound as parameters; only the validated table name is
+    spliced into the SQL.
+
+    ``csv_path`` may also be a glob or a list of files. DuckDB then scans
+    all of them in one parallel read, matching columns by name.
 
     Returns:
         Number of rows loaded.
     """
-    conn = duckdb.connect(warehouse_path)
-    try:
-        conn.execute(f"""
-            CREATE OR REPLACE TABLE raw.{table_name} AS
-            SELECT * FROM read_csv_auto('{csv_path}')
-        """)
-        count = conn.execute(f"SELECT COUNT(*) FROM raw.{table_name}").fetchone()[0]
-        print(f"Loaded {count} records into raw.{table_name}")
-        return count
-    finally:
-        conn.close()
+    multi_file = not isinstance(csv_path, str) or any(c in csv_path for c in "*?[")
+    options = {
+        "columns": columns,
+        "delim": delim,
+        "header": header,
+        "union_by_name": True if multi_file else None,
+    }
+    bound = {name: value for name, value in options.items() if value is not None}
+    named_args = "".join(f", {name} = ?" for name in bound)
+    return _create_raw_table(
+        warehouse_path,
+        table_name,
+        f"SELECT * FROM read_csv(?{named_args}, parallel = true)",
+        [csv_path, *bound.values()],
+    )
+
+
+def load_parquet_to_raw(
+    warehouse_path: str,
+    parquet_path: str | list[str],
+    table_name: str,
+) -> int:
+    """Load a Parquet file (or glob/list of files) into a raw.* table.
+
+    Parquet carries its own schema, so DuckDB reads it natively with no
+    sniffing or type conversion.
+
+    Returns:
+        Number of rows loaded.
+    """
+    return _create_raw_table(
+        warehouse_path,
+        table_name,
+        "SELECT * FROM read_parquet(?, union_by_name = true)",
+        [parquet_path],
+    )
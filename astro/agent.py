@@ -1,10 +1,16 @@
 """Gemini-powered agent that answers questions by exploring and querying a DuckDB warehouse."""
 
+import hashlib
+import json
+import random
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal
 
+import httpx
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 
 from astro.db import DataLayer
 from astro import fmt
@@ -33,6 +39,21 @@ Your job is to answer user questions by exploring the schema and running Postgre
 
 MAX_TURNS = 25
 MAX_RETRIES = 3
+MAX_BACKOFF_SECONDS = 30  # Upper bound on a single retry wait
+RETRY_BUDGET_SECONDS = 60  # Wall-clock budget for one model call including retries
+MAX_RESULT_BYTES = 8192  # Cap on a single tool result sent back to the model
+MAX_TOOL_WORKERS = 4  # Parallel tool calls within a single model turn
+
+# HTTP status codes on google.genai APIError: give up vs. back off and retry
+_AUTH_STATUS_CODES = frozenset({401, 403})
+_RETRYABLE_STATUS_CODES = frozenset({429, 503, 504})
+
+# Lowercase message fragments used when the exception type is not recognised
+_AUTH_MARKERS = ("401", "403", "unauthenticated", "credentials_missing", "permission")
+_RETRYABLE_MARKERS = (
+    "rate limit", "resource_exhausted", "429", "quota",
+    "timeout", "deadline", "503", "unavailable",
+)
 
 TOOL_DECLARATIONS = [
     {
@@ -97,6 +118,13 @@ TOOL_DECLARATIONS = [
     },
 ]
 
+# Built once at import; every Agent shares the same compiled tool list
+_TOOLS = [types.Tool(function_declarations=TOOL_DECLARATIONS)]
+
+
+class AuthenticationError(RuntimeError):
+    """The API key was rejected on the first call; retrying other questions won't help."""
+
 
 class Agent:
     def __init__(
@@ -110,32 +138,16 @@ class Agent:
         self.model = model
         self._query_errors: list[dict[str, str]] = []
         self._contents: list[types.Content] = []
-        self._tools = [types.Tool(function_declarations=TOOL_DECLARATIONS)]
+        self._tools = _TOOLS
+        self._config_cache: tuple[int, types.GenerateContentConfig] | None = None
         self._current_sources: list[dict] = []
-        self._preflight()
-
-    def _preflight(self):
-        """Quick auth check before starting the agent loop."""
-        try:
-            self.client.models.generate_content(
-                model=self.model,
-                contents="ping",
-                config=types.GenerateContentConfig(max_output_tokens=1),
-            )
-        except Exception as e:
-            err = str(e)
-            if "401" in err or "UNAUTHENTICATED" in err or "CREDENTIALS_MISSING" in err:
-                raise RuntimeError(
-                    "Authentication failed.\n"
-                    "  1. Get a key from https://aistudio.google.com/apikey\n"
-                    "  2. export GEMINI_API_KEY=<your-key>\n"
-                    "  3. Make sure you're NOT using a Google Cloud Console key."
-                ) from e
-            raise
+        # Auth problems surface on the first real call; see _call_model
+        self._first_call = True
 
     def ask(self, question: str) -> str:
         """Append a user question and run the tool-calling loop until an answer."""
         self._current_sources = []
+        self.dl.refresh_if_changed()
 
         self._contents.append(
             types.Content(
@@ -145,41 +157,69 @@ class Agent:
         )
 
         for turn in range(MAX_TURNS):
-            response = self._call_model(self._contents, self._tools)
-            candidate = response.candidates[0]
+            content = self._call_model(self._contents, self._tools)
 
             function_calls = [
-                p for p in candidate.content.parts if p.function_call is not None
+                p for p in content.parts if p.function_call is not None
             ]
 
             if not function_calls:
                 # Persist the model's final text reply in history
-                self._contents.append(candidate.content)
-                text_parts = [p.text for p in candidate.content.parts if p.text]
+                self._contents.append(content)
+                text_parts = [p.text for p in content.parts if p.text]
                 return "\n".join(text_parts) if text_parts else "(No response from model)"
 
             # Append model's response (with function calls) to conversation
-            self._contents.append(candidate.content)
-
-            # Execute each function call and collect responses
-            response_parts = []
-            for fc_part in function_calls:
-                fc = fc_part.function_call
-                args = _to_native(fc.args) if fc.args else {}
-                result = self._execute_tool(fc.name, args)
-                response_parts.append(
-                    types.Part(
-                        function_response=types.FunctionResponse(
-                            name=fc.name,
-                            response={"result": result},
-                        )
+            self._contents.append(content)
+
+            # Execute the function calls (concurrently when there are several)
+            calls = [
+                (p.function_call.name, _to_native(p.function_call.args) if p.function_call.args else {})
+                for p in function_calls
+            ]
+            if len(calls) == 1:
+                outcomes = [self._execute_tool(*calls[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=min(len(calls), MAX_TOOL_WORKERS)) as ex:
+                    outcomes = list(ex.map(lambda call: self._execute_tool(*call), calls))
+
+            # Record sources here, in call order, rather than from worker threads
+            results = [result for result, _ in outcomes]
+            self._current_sources.extend(source for _, source in outcomes if source)
+
+            response_parts = [
+                types.Part(
+                    function_response=types.FunctionResponse(
+                        name=name,
+                        response={"result": _truncate_for_llm(result)},
                     )
                 )
+                for (name, _), result in zip(calls, results)
+            ]
 
-            self._contents.append(types.Content(parts=response_parts))
+            self._contents.append(types.Content(role="user", parts=response_parts))
+            self._compact_history()
 
         return "(Agent reached maximum turns without a final answer. Try a more specific question.)"
 
+    def _compact_history(self):
+        """Replace row data in already-consumed tool results with short summaries.
+
+        Every turn re-sends the whole history, so sample/query rows the model
+        has already seen would otherwise be re-tokenized on each call. The
+        latest model turn and tool responses (the last two entries) are left
+        intact. Schema results are kept since later SQL depends on them.
+        """
+        for content in self._contents[:-2]:
+            for part in content.parts or []:
+                fr = part.function_response
+                if fr is None or fr.response is None:
+                    continue
+                result = fr.response.get("result")
+                if not isinstance(result, dict) or "rows" not in result:
+                    continue
+                fr.response = {"result": _summarize_rows(fr.name, result)}
+
     def get_sources(self) -> list[dict]:
         """Return sources collected during the last ask() call."""
         return self._current_sources
@@ -189,6 +229,18 @@ class Agent:
         self._query_errors.append({"sql": sql, "error": error})
         _log(fmt.warning(f"Query error recorded ({len(self._query_errors)} total)"))
 
+    def _generation_config(self, tools) -> types.GenerateContentConfig:
+        """Return the request config, rebuilt only when a new query error is recorded."""
+        error_count = len(self._query_errors)
+        if self._config_cache is None or self._config_cache[0] != error_count:
+            config = types.GenerateContentConfig(
+                tools=tools,
+                system_instruction=self._build_system_prompt(),
+                temperature=0.1,
+            )
+            self._config_cache = (error_count, config)
+        return self._config_cache[1]
+
     def _build_system_prompt(self) -> str:
         """Build system prompt, appending any accumulated query errors."""
         if not self._query_errors:
@@ -200,49 +252,57 @@ class Agent:
             lines.append(f"Error: {entry['error']}")
         return "\n".join(lines)
 
-    def _call_model(self, contents, tools):
-        """Call Gemini with exponential-backoff retry for rate limits and timeouts."""
+    def _call_model(self, contents, tools) -> types.Content:
+        """Call Gemini and return the model's Content, retrying rate limits and timeouts.
+
+        Retries use full-jitter exponential backoff so concurrent clients don't
+        retry in lockstep, and give up early once the retry budget is spent.
+        """
+        deadline = time.monotonic() + RETRY_BUDGET_SECONDS
         for attempt in range(MAX_RETRIES):
             try:
-                return self.client.models.generate_content(
+                response = self.client.models.generate_content(
                     model=self.model,
                     contents=contents,
-                    config=types.GenerateContentConfig(
-                        tools=tools,
-                        system_instruction=self._build_system_prompt(),
-                        temperature=0.1,
-                    ),
+                    config=self._generation_config(tools),
                 )
+                self._first_call = False
+                return response.candidates[0].content
             except Exception as e:
-                err = str(e).lower()
+                kind = _classify_error(e)
                 # Fail fast on auth errors — no point retrying
-                if "401" in err or "403" in err or "unauthenticated" in err or "permission" in err:
-                    if "api key" in err:
+                if kind == "auth":
+                    if self._first_call:
+                        raise AuthenticationError(
+                            "Authentication failed.\n"
+                            "  1. Get a key from https://aistudio.google.com/apikey\n"
+                            "  2. export GEMINI_API_KEY=<your-key>\n"
+                            "  3. Make sure you're NOT using a Google Cloud Console key."
+                        ) from e
+                    if "api key" in str(e).lower():
                         raise RuntimeError(
                             "Authentication failed. Make sure you're using a Gemini API key "
                             "from https://aistudio.google.com/apikey (not a Google Cloud key)."
                         ) from e
                     raise
-                retryable = (
-                    "rate limit" in err
-                    or "resource_exhausted" in err
-                    or "429" in err
-                    or "quota" in err
-                    or "timeout" in err
-                    or "deadline" in err
-                    or "503" in err
-                    or "unavailable" in err
-                )
-                if retryable and attempt < MAX_RETRIES - 1:
-                    wait = 2 ** (attempt + 1)
-                    _log(fmt.warning(f"Retryable error ({type(e).__name__}). Waiting {wait}s..."))
+                wait = random.uniform(0, min(2 ** (attempt + 1), MAX_BACKOFF_SECONDS))
+                if (
+                    kind == "retryable"
+                    and attempt < MAX_RETRIES - 1
+                    and time.monotonic() + wait <= deadline
+                ):
+                    _log(fmt.warning(f"Retryable error ({type(e).__name__}). Waiting {wait:.1f}s..."))
                     time.sleep(wait)
                     continue
                 raise
         raise RuntimeError("Max retries exceeded for Gemini API call")
 
-    def _execute_tool(self, name: str, args: dict):
-        """Dispatch a tool call to the data layer and display results."""
+    def _execute_tool(self, name: str, args: dict) -> tuple[object, dict | None]:
+        """Dispatch a tool call to the data layer and display results.
+
+        Returns the result and the source entry to record for it (or None).
+        Safe to run on a worker thread: it does not touch self._current_sources.
+        """
         args = _sanitize_args(name, args)
         _print_step(name, args)
 
@@ -251,52 +311,48 @@ class Agent:
                 case "list_schemas":
                     result = self.dl.list_schemas()
                     display.show_schemas(result)
-                    return result
+                    return result, None
 
                 case "list_tables":
                     result = self.dl.list_tables(args["schema"])
                     display.show_tables(result, args["schema"])
-                    self._current_sources.append({
+                    return result, {
                         "type": "table_discovery",
                         "table": f"{args['schema']}.*",
-                    })
-                    return result
+                    }
 
                 case "describe_table":
                     result = self.dl.describe_table(args["schema"], args["table"])
                     display.show_columns(result, args["schema"], args["table"])
-                    self._current_sources.append({
+                    return result, {
                         "type": "schema_inspection",
                         "table": f"{args['schema']}.{args['table']}",
-                    })
-                    return result
+                    }
 
                 case "sample_data":
                     result = self.dl.sample_data(
                         args["schema"], args["table"], args.get("limit", 5)
                     )
                     display.show_data(result.get("columns", []), result.get("rows", []))
-                    self._current_sources.append({
+                    return result, {
                         "type": "data_sample",
                         "table": f"{args['schema']}.{args['table']}",
-                    })
-                    return result
+                    }
 
                 case "execute_query":
                     result = self.dl.execute_query(args["sql"])
                     if isinstance(result, dict) and "error" in result:
                         self._record_query_error(args["sql"], result["error"])
-                    else:
-                        display.show_query_result(result)
-                        self._current_sources.append({
-                            "type": "query",
-                            "sql": args["sql"],
-                            "row_count": result.get("row_count", 0),
-                        })
-                    return result
+                        return result, None
+                    display.show_query_result(result)
+                    return result, {
+                        "type": "query",
+                        "sql": args["sql"],
+                        "row_count": result.get("row_count", 0),
+                    }
 
                 case _:
-                    return {"error": f"Unknown tool: {name}"}
+                    return {"error": f"Unknown tool: {name}"}, None
         except Exception as e:
             _log(fmt.error(str(e)))
             if name == "execute_query":
@@ -307,7 +363,7 @@ class Agent:
                 "args_received": {k: type(v).__name__ for k, v in args.items()},
                 "hint": f"The call to '{name}' failed. Check that all required "
                         "arguments are provided with correct types and retry.",
-            }
+            }, None
 
 
 _ARG_DEFAULTS: dict[str, dict[str, object]] = {
@@ -334,6 +390,80 @@ def _to_native(obj):
     return obj
 
 
+def _classify_error(e: Exception) -> Literal["auth", "retryable", "fatal"]:
+    """Decide whether a Gemini call failure is an auth problem, transient, or final."""
+    if isinstance(e, errors.APIError):
+        if e.code in _AUTH_STATUS_CODES:
+            return "auth"
+        return "retryable" if e.code in _RETRYABLE_STATUS_CODES else "fatal"
+    if isinstance(e, httpx.TimeoutException):
+        return "retryable"
+
+    # Unknown exception type: fall back to matching the message
+    err = str(e).lower()
+    if any(marker in err for marker in _AUTH_MARKERS):
+        return "auth"
+    if any(marker in err for marker in _RETRYABLE_MARKERS):
+        return "retryable"
+    return "fatal"
+
+
+def _truncate_for_llm(result, max_bytes: int = MAX_RESULT_BYTES):
+    """Trim a tool result so its JSON form stays under max_bytes.
+
+    Lists keep their leading items and row-bearing dicts keep their leading
+    rows; either way the result gains ``_truncated`` and ``total_rows`` so
+    the model knows it is looking at a prefix. Anything else is returned
+    unchanged.
+    """
+    def size(obj) -> int:
+        return len(json.dumps(obj, default=str))
+
+    if size(result) <= max_bytes:
+        return result
+
+    if isinstance(result, list):
+        items, base = result, {"items": [], "_truncated": True, "total_rows": len(result)}
+    elif isinstance(result, dict) and isinstance(result.get("rows"), list):
+        items = result["rows"]
+        base = {**result, "rows": [], "_truncated": True, "total_rows": len(items)}
+    else:
+        return result
+
+    budget = max_bytes - size(base)
+    keep = 0
+    for item in items:
+        budget -= size(item) + 2  # separator between list elements
+        if budget < 0:
+            break
+        keep += 1
+
+    key = "items" if isinstance(result, list) else "rows"
+    return {**base, key: items[:keep]}
+
+
+def _summarize_rows(tool_name: str, result: dict) -> dict:
+    """Collapse a row-bearing tool result into a compact stub for history.
+
+    The count is the size of the full result, not of the rows the model was
+    shown; if it only saw a prefix, the stub says so.
+    """
+    digest = hashlib.sha1(
+        json.dumps(result, sort_keys=True, default=str).encode()
+    ).hexdigest()[:8]
+    # row_count is the query's full size; total_rows is the pre-trim row count
+    total = result.get("row_count", result.get("total_rows", len(result["rows"])))
+    stub = {
+        "summary": f"{tool_name}: {total} rows returned",
+        "columns": result.get("columns", []),
+        "hash": digest,
+    }
+    if result.get("_truncated") or "note" in result:
+        stub["truncated"] = True
+        stub["rows_shown"] = len(result["rows"])
+    return stub
+
+
 def _sanitize_args(tool_name: str, args: dict) -> dict:
     """Replace None values with sensible defaults so downstream code never blows up."""
     defaults = _ARG_DEFAULTS.get(tool_name, {})
@@ -1,47 +1,53 @@
 """CLI entry point: astro --ask '<question>' or interactive chat."""
 
 import argparse
+import functools
 import os
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from dotenv import load_dotenv
-from prompt_toolkit import PromptSession
-from prompt_toolkit.formatted_text import ANSI
-
-from astro.db import DataLayer
-from astro.agent import Agent
 from astro import fmt
 
+# prompt_toolkit, dotenv, DuckDB and the Gemini client are imported where
+# they are first needed so `astro --help` and startup errors stay fast.
+if TYPE_CHECKING:
+    from astro.agent import Agent
 
-def _find_env() -> Path | None:
-    """Walk up from CWD looking for .env."""
-    current = Path.cwd()
+
+def _walk_up(*parts: str) -> Path | None:
+    """Return the first CWD/<parts> file found walking up at most 6 levels."""
+    current = os.getcwd()
     for _ in range(6):
-        candidate = current / ".env"
-        if candidate.exists():
-            return candidate
-        if current.parent == current:
+        candidate = os.path.join(current, *parts)
+        if os.path.isfile(candidate):
+            return Path(candidate)
+        parent = os.path.dirname(current)
+        if parent == current:
             break
-        current = current.parent
+        current = parent
     return None
 
 
+@functools.lru_cache(maxsize=1)
+def _find_env() -> Path | None:
+    """Walk up from CWD looking for .env."""
+    return _walk_up(".env")
+
+
+@functools.lru_cache(maxsize=1)
 def _find_warehouse() -> Path | None:
     """Walk up from CWD looking for warehouse/data.duckdb."""
-    current = Path.cwd()
-    for _ in range(6):
-        candidate = current / "warehouse" / "data.duckdb"
-        if candidate.exists():
-            return candidate
-        if current.parent == current:
-            break
-        current = current.parent
-    return None
+    return _walk_up("warehouse", "data.duckdb")
 
 
-def _chat_loop(agent: Agent):
+def _chat_loop(agent: "Agent"):
     """Interactive REPL — read questions from stdin until quit or EOF."""
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.formatted_text import ANSI
+
+    from astro.agent import AuthenticationError
+
     print(
         f"\n  {fmt.DIM}Type a question, or 'quit' to exit.{fmt.RESET}\n",
         file=sys.stderr,
@@ -63,14 +69,18 @@ def _chat_loop(agent: Agent):
         print(file=sys.stderr)
         try:
             answer = agent.ask(question)
-            print(fmt.answer_box(answer))
-            print(fmt.sources_section(agent.get_sources()))
-            print()
+            # One write per answer; flush so it lands before the next prompt
+            sys.stdout.write(
+                f"{fmt.answer_box(answer)}\n{fmt.sources_section(agent.get_sources())}\n\n"
+            )
+            sys.stdout.flush()
         except KeyboardInterrupt:
             print(
                 f"\n  {fmt.DIM}(interrupted — ask another question or 'quit'){fmt.RESET}\n",
                 file=sys.stderr,
             )
+        except AuthenticationError:
+            raise  # A rejected key fails every question; let main() exit
         except Exception as e:
             print(fmt.error(str(e)), file=sys.stderr)
             print(file=sys.stderr)
@@ -86,6 +96,8 @@ def main():
     # --- load .env from project root ---
     env_path = _find_env()
     if env_path:
+        from dotenv import load_dotenv
+
         load_dotenv(env_path)
 
     # --- resolve database ---
@@ -106,12 +118,15 @@ def main():
     api_key = api_key.strip()
 
     # --- run ---
+    from astro.db import DataLayer
+    from astro.agent import Agent
+
     model = "gemini-2.5-flash"
     dl = DataLayer(db_path)
     try:
         print(fmt.banner(str(db_path), model), file=sys.stderr)
         agent = Agent(dl, api_key, model=model)
-        print(fmt.success("Connected."), file=sys.stderr)
+        print(fmt.success("Ready."), file=sys.stderr)
 
         # Drop into interactive chat
         _chat_loop(agent)
@@ -10,6 +10,37 @@ import re
 import duckdb
 from pathlib import Path
 
+# DuckDB column types whose fetched Python values are already JSON-safe
+_PASSTHROUGH_TYPES = frozenset({
+    "BOOLEAN", "VARCHAR",
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT", "UHUGEINT",
+})
+_FLOAT_TYPES = frozenset({"FLOAT", "DOUBLE"})
+
+# Letters, digits and underscores only; safe to splice inside double quotes
+_IDENTIFIER_RE = re.compile(r"\w+")
+
+# Introspection queries, built once and reused with bound parameters
+_LIST_SCHEMAS_SQL = """
+    SELECT DISTINCT schema_name
+    FROM information_schema.schemata
+    WHERE schema_name NOT IN ('information_schema', 'pg_catalog')
+    ORDER BY schema_name
+"""
+_LIST_TABLES_SQL = """
+    SELECT table_name, table_type
+    FROM information_schema.tables
+    WHERE table_schema = ?
+    ORDER BY table_name
+"""
+_DESCRIBE_TABLE_SQL = """
+    SELECT column_name, data_type, is_nullable
+    FROM information_schema.columns
+    WHERE table_schema = ? AND table_name = ?
+    ORDER BY ordinal_position
+"""
+
 
 class DataLayer:
     def __init__(self, db_path: str | Path):
@@ -17,60 +48,61 @@ class DataLayer:
         if not self.db_path.exists():
             raise FileNotFoundError(f"Database not found: {self.db_path}")
         self.conn = duckdb.connect(str(self.db_path), read_only=True)
+        # Schema metadata cache, valid until the warehouse file changes on disk
+        self._metadata_cache: dict[tuple, object] = {}
+        self._metadata_mtime = self.db_path.stat().st_mtime_ns
 
     def close(self):
         self.conn.close()
 
+    def refresh_if_changed(self) -> None:
+        """Drop cached schema metadata if the warehouse file was modified."""
+        mtime = self.db_path.stat().st_mtime_ns
+        if mtime != self._metadata_mtime:
+            self._metadata_cache.clear()
+            self._metadata_mtime = mtime
+
+    def _cached(self, key: tuple, compute):
+        """Return the cached value for key, computing and storing it on a miss."""
+        if key not in self._metadata_cache:
+            self._metadata_cache[key] = compute()
+        return self._metadata_cache[key]
+
+    def _cursor(self) -> duckdb.DuckDBPyConnection:
+        """Open a per-call cursor so tool calls can safely run on separate threads."""
+        return self.conn.cursor()
+
     def list_schemas(self) -> list[str]:
         """List all user-created schemas in the database."""
-        rows = self.conn.execute(
-            """
-            SELECT DISTINCT schema_name
-            FROM information_schema.schemata
-            WHERE schema_name NOT IN ('information_schema', 'pg_catalog')
-            ORDER BY schema_name
-            """
-        ).fetchall()
+        return self._cached(("schemas",), self._list_schemas)
+
+    def _list_schemas(self) -> list[str]:
+        with self._cursor() as cur:
+            rows = cur.execute(_LIST_SCHEMAS_SQL).fetchall()
         return [r[0] for r in rows]
 
     def list_tables(self, schema: str) -> list[dict]:
         """List tables/views in a schema with row counts."""
-        rows = self.conn.execute(
-            """
-            SELECT table_name, table_type
-            FROM information_schema.tables
-            WHERE table_schema = ?
-            ORDER BY table_name
-            """,
-            [schema],
-        ).fetchall()
-
-        results = []
-        for table_name, table_type in rows:
-            try:
-                count = self.conn.execute(
-                    f'SELECT COUNT(*) FROM "{schema}"."{table_name}"'
-                ).fetchone()[0]
-            except Exception:
-                count = None
-            results.append({
-                "name": table_name,
-                "type": table_type,
-                "row_count": count,
-            })
-        return results
+        return self._cached(("tables", schema), lambda: self._list_tables(schema))
+
+    def _list_tables(self, schema: str) -> list[dict]:
+        with self._cursor() as cur:
+            rows = cur.execute(_LIST_TABLES_SQL, [schema]).fetchall()
+            counts = _count_rows(cur, schema, [r[0] for r in rows])
+        return [
+            {"name": table_name, "type": table_type, "row_count": count}
+            for (table_name, table_type), count in zip(rows, counts)
+        ]
 
     def describe_table(self, schema: str, table: str) -> list[dict]:
         """Get column names, types, and nullability for a table."""
-        rows = self.conn.execute(
-            """
-            SELECT column_name, data_type, is_nullable
-            FROM information_schema.columns
-            WHERE table_schema = ? AND table_name = ?
-            ORDER BY ordinal_position
-            """,
-            [schema, table],
-        ).fetchall()
+        return self._cached(
+            ("columns", schema, table), lambda: self._describe_table(schema, table)
+        )
+
+    def _describe_table(self, schema: str, table: str) -> list[dict]:
+        with self._cursor() as cur:
+            rows = cur.execute(_DESCRIBE_TABLE_SQL, [schema, table]).fetchall()
         return [{"column": r[0], "type": r[1], "nullable": r[2]} for r in rows]
 
     def sample_data(self, schema: str, table: str, limit: int = 5) -> dict:
@@ -79,31 +111,42 @@ class DataLayer:
         if not _valid_identifier(schema) or not _valid_identifier(table):
             raise ValueError(f"Invalid identifier: {schema}.{table}")
 
-        result = self.conn.execute(
-            f'SELECT * FROM "{schema}"."{table}" LIMIT {limit}'
-        )
-        columns = [desc[0] for desc in result.description]
-        rows = result.fetchall()
+        with self._cursor() as cur:
+            result = cur.execute(
+                f'SELECT * FROM "{schema}"."{table}" LIMIT {limit}'
+            )
+            description = result.description
+            rows = result.fetchall()
         return {
-            "columns": columns,
-            "rows": [[_serialize(v) for v in row] for row in rows],
+            "columns": [desc[0] for desc in description],
+            "rows": _serialize_rows(description, rows),
         }
 
     def execute_query(self, sql: str) -> dict:
-        """Execute a read-only SQL query. Results capped at 100 rows."""
-        result = self.conn.execute(sql.rstrip(';'))
-        columns = [desc[0] for desc in result.description]
-        rows = result.fetchall()
-        
-        total = len(rows)
-        truncated = total > 100
-        
-        if truncated:
-            rows = rows[:100]
-        
+        """Execute a read-only SQL query. Results capped at 100 rows.
+
+        The cap is pushed into DuckDB as a LIMIT on the query relation, so
+        oversized results are never materialized; the full count is only
+        computed when the result actually overflows the cap.
+        """
+        with self._cursor() as cur:
+            rel = cur.sql(sql.rstrip(';'))
+            if rel is None:
+                # Statement with no result set (e.g. SET)
+                return {"columns": [], "rows": [], "row_count": 0}
+            head = rel.limit(101)
+            description = head.description
+            rows = head.fetchall()
+            truncated = len(rows) > 100
+            if truncated:
+                rows = rows[:100]
+                total = rel.aggregate("count(*)").fetchone()[0]
+            else:
+                total = len(rows)
+
         output = {
-            "columns": columns,
-            "rows": [[_serialize(v) for v in row] for row in rows],
+            "columns": [desc[0] for desc in description],
+            "rows": _serialize_rows(description, rows),
             "row_count": total,
         }
         if truncated:
@@ -111,8 +154,65 @@ class DataLayer:
         return output
 
 
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _count_rows(cur, schema: str, tables: list[str], batch_size: int = 100) -> list[int | None]:
+    """Exact row counts for tables in a schema, one UNION ALL query per batch.
+
+    If a batch fails (e.g. a broken view), its tables are counted one by
+    one so only the failing table reports None.
+    """
+    counts: list[int | None] = []
+    for start in range(0, len(tables), batch_size):
+        batch = tables[start:start + batch_size]
+        sql = "\nUNION ALL\n".join(
+            f"SELECT {i} AS idx, COUNT(*) FROM {_quote(schema)}.{_quote(t)}"
+            for i, t in enumerate(batch)
+        )
+        try:
+            by_idx = dict(cur.execute(sql).fetchall())
+            counts.extend(by_idx[i] for i in range(len(batch)))
+        except Exception:
+            for t in batch:
+                try:
+                    counts.append(
+                        cur.execute(f"SELECT COUNT(*) FROM {_quote(schema)}.{_quote(t)}").fetchone()[0]
+                    )
+                except Exception:
+                    counts.append(None)
+    return counts
+
+
 def _valid_identifier(name: str) -> bool:
-    return all(c.isalnum() or c == '_' for c in name) and len(name) > 0
+    return _IDENTIFIER_RE.fullmatch(name) is not None
+
+
+def _serialize_rows(description, rows: list[tuple]) -> list[list]:
+    """Convert fetched rows to JSON-safe values, picking one converter per column.
+
+    Column types come from the cursor description, so integer, string and
+    boolean columns pass through untouched and only the remaining columns
+    pay for per-value conversion.
+    """
+    if not rows:
+        return []
+    columns = list(zip(*rows))
+    for i, desc in enumerate(description):
+        type_name = str(desc[1])
+        if type_name in _PASSTHROUGH_TYPES:
+            continue
+        convert = _serialize_float if type_name in _FLOAT_TYPES else _serialize
+        columns[i] = [convert(v) for v in columns[i]]
+    return [list(row) for row in zip(*columns)]
+
+
+def _serialize_float(value):
+    """Map NaN/Inf to None; finite floats and None pass through."""
+    if value is None or math.isfinite(value):
+        return value
+    return None
 
 
 def _serialize(value):
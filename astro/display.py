@@ -5,41 +5,37 @@ import sys
 from astro import fmt
 
 
+def _emit(msg: str) -> None:
+    """Write one dimmed summary line to stderr in a single write call."""
+    sys.stderr.write(f"  {fmt.DIM}{msg}{fmt.RESET}\n")
+
+
 def show_schemas(schemas: list[str]) -> None:
     if not schemas:
         return
-    print(f"  {fmt.DIM}Found {len(schemas)} schema(s){fmt.RESET}", file=sys.stderr)
+    _emit(f"Found {len(schemas)} schema(s)")
 
 
 def show_tables(tables: list[dict], schema: str) -> None:
     if not tables:
         return
-    print(
-        f"  {fmt.DIM}Found {len(tables)} table(s) in {schema}{fmt.RESET}",
-        file=sys.stderr,
-    )
+    _emit(f"Found {len(tables)} table(s) in {schema}")
 
 
 def show_columns(columns: list[dict], schema: str, table: str) -> None:
     if not columns:
         return
-    print(
-        f"  {fmt.DIM}Table {schema}.{table} has {len(columns)} column(s){fmt.RESET}",
-        file=sys.stderr,
-    )
+    _emit(f"Table {schema}.{table} has {len(columns)} column(s)")
 
 
 def show_data(columns: list[str], rows: list[list], limit: int = 10) -> None:
     if not rows:
         return
-    print(f"  {fmt.DIM}Sampled {len(rows)} row(s){fmt.RESET}", file=sys.stderr)
+    _emit(f"Sampled {len(rows)} row(s)")
 
 
 def show_query_result(result: dict) -> None:
     if "error" in result:
         return  # errors are already shown by agent
     row_count = result.get("row_count", len(result.get("rows", [])))
-    print(
-        f"  {fmt.DIM}Query returned {row_count} row(s){fmt.RESET}",
-        file=sys.stderr,
-    )
+    _emit(f"Query returned {row_count} row(s)")
@@ -1,6 +1,8 @@
 """Terminal colors and formatting — ANSI escape codes, no dependencies."""
 
+import functools
 import sys
+import textwrap
 
 # Detect whether stderr supports color
 _COLOR = hasattr(sys.stderr, "isatty") and sys.stderr.isatty()
@@ -23,6 +25,11 @@ BOLD_GREEN = _esc("1;32")
 BOLD_YELLOW = _esc("1;33")
 BOLD_RED = _esc("1;31")
 
+# Fixed ANSI prefixes, built once so the helpers below only concatenate
+_STEP_SQL_PREFIX = f"  {CYAN}>{RESET} {DIM}Executing:{RESET} {DIM}{CYAN}"
+_ERROR_PREFIX = f"  {BOLD_RED}error:{RESET} "
+_WARNING_PREFIX = f"  {BOLD_YELLOW}warn:{RESET} "
+
 
 def banner(db_path: str, model: str) -> str:
     line = f"{BOLD_CYAN}astro{RESET} {DIM}~ natural language data warehouse agent{RESET}"
@@ -37,15 +44,15 @@ def step(icon: str, msg: str) -> str:
 
 def step_sql(sql: str) -> str:
     display = sql if len(sql) <= 100 else sql[:97] + "..."
-    return f"  {CYAN}>{RESET} {DIM}Executing:{RESET} {DIM}{CYAN}{display}{RESET}"
+    return _STEP_SQL_PREFIX + display + RESET
 
 
 def error(msg: str) -> str:
-    return f"  {BOLD_RED}error:{RESET} {msg}"
+    return _ERROR_PREFIX + msg
 
 
 def warning(msg: str) -> str:
-    return f"  {BOLD_YELLOW}warn:{RESET} {msg}"
+    return _WARNING_PREFIX + msg
 
 
 def success(msg: str) -> str:
@@ -56,35 +63,32 @@ def answer_header() -> str:
     return f"\n{BOLD_GREEN}Answer{RESET}\n"
 
 
+@functools.lru_cache(maxsize=8)
+def _box_chrome(width: int) -> tuple[str, str, str, str]:
+    """Top border, header row, divider and bottom border for a box of this width."""
+    inner_width = width - 4
+    top = f"┌{'─' * (width - 2)}┐"
+    header = f"│ {BOLD_GREEN}Answer{RESET}{' ' * (inner_width - 6)} │"
+    divider = f"├{'─' * (width - 2)}┤"
+    bottom = f"└{'─' * (width - 2)}┘"
+    return top, header, divider, bottom
+
+
 def answer_box(text: str, width: int = 50) -> str:
     """Wrap the answer in a unicode box."""
-    import textwrap
-
     inner_width = width - 4  # Account for "│ " and " │"
 
     # Wrap text to fit inside the box
     lines = []
     for paragraph in text.split("\n"):
         if paragraph.strip():
-            wrapped = textwrap.wrap(paragraph, width=inner_width)
-            lines.extend(wrapped)
+            lines.extend(textwrap.wrap(paragraph, width=inner_width))
         else:
             lines.append("")
 
-    # Build the box
-    top = f"┌{'─' * (width - 2)}┐"
-    header = f"│ {BOLD_GREEN}Answer{RESET}{' ' * (inner_width - 6)} │"
-    divider = f"├{'─' * (width - 2)}┤"
-    bottom = f"└{'─' * (width - 2)}┘"
-
-    content_lines = []
-    for line in lines:
-        # Pad line to fill the box width
-        padded = line + " " * (inner_width - len(line))
-        content_lines.append(f"│ {padded} │")
-
-    parts = [top, header, divider] + content_lines + [bottom]
-    return "\n".join(parts)
+    top, header, divider, bottom = _box_chrome(width)
+    content_lines = [f"│ {line.ljust(inner_width)} │" for line in lines]
+    return "\n".join([top, header, divider, *content_lines, bottom])
 
 
 def prompt() -> str:
@@ -1,7 +1,15 @@
 """Assertion helpers for evaluating agent answers against ground truth."""
 
 import re
+from collections.abc import Iterator
 from dataclasses import dataclass
+from functools import cached_property
+
+# A run of number characters (dollar signs included) and its optional scale
+# word; runs are short, so they are split into individual numbers separately
+_NUMBER_RUN_RE = re.compile(r"([\d,.$]+)(?:\s*(million|billion))?", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"[\d,]+\.?\d*")
+_MULTIPLIERS = {"million": 1_000_000, "billion": 1_000_000_000}
 
 
 @dataclass
@@ -10,8 +18,29 @@ class AssertionResult:
     message: str
 
 
-def check_assertion(answer: str, assertion: dict) -> AssertionResult:
-    """Dispatch an assertion check based on its type."""
+class AnswerContext:
+    """An agent answer plus derived forms, computed lazily and shared by
+    every assertion checked against it."""
+
+    def __init__(self, raw: str):
+        self.raw = raw
+
+    @cached_property
+    def lower(self) -> str:
+        return self.raw.lower()
+
+    @cached_property
+    def numbers(self) -> list[float]:
+        return _extract_numbers(self.raw)
+
+
+def check_assertion(answer: str | AnswerContext, assertion: dict) -> AssertionResult:
+    """Dispatch an assertion check based on its type.
+
+    Pass an AnswerContext when checking several assertions against the
+    same answer so derived forms are computed only once.
+    """
+    ctx = answer if isinstance(answer, AnswerContext) else AnswerContext(answer)
     dispatch = {
         "exact_number": _check_exact_number,
         "row_count": _check_exact_number,
@@ -23,39 +52,38 @@ def check_assertion(answer: str, assertion: dict) -> AssertionResult:
     checker = dispatch.get(assertion["type"])
     if checker is None:
         return AssertionResult(False, f"Unknown assertion type: {assertion['type']}")
-    return checker(answer, assertion)
+    return checker(ctx, assertion)
 
 
-def _extract_numbers(text: str) -> list[float]:
-    """Extract all numbers from text, handling commas, dollar signs, and suffixes.
+def _iter_numbers(text: str) -> Iterator[float]:
+    """Yield each number in text, handling commas, dollar signs, and suffixes.
 
     Handles formats like: 35980, 35,980, $1,006.25, 18.6 million, etc.
     """
-    cleaned = text.replace("$", "")
-    raw_matches = re.findall(r"[\d,]+\.?\d*", cleaned)
-    numbers = []
-    for match in raw_matches:
-        try:
-            numbers.append(float(match.replace(",", "")))
-        except ValueError:
-            continue
-
-    for pattern, multiplier in [
-        (r"([\d,.]+)\s*million", 1_000_000),
-        (r"([\d,.]+)\s*billion", 1_000_000_000),
-    ]:
-        for m in re.findall(pattern, text, re.IGNORECASE):
+    for m in _NUMBER_RUN_RE.finditer(text):
+        run, unit = m.groups()
+        for match in _NUMBER_RE.findall(run.replace("$", "")):
             try:
-                numbers.append(float(m.replace(",", "")) * multiplier)
+                yield float(match.replace(",", ""))
             except ValueError:
                 continue
+        if unit:
+            # Only the digits after the last "$" are scaled, e.g. "$18.6 million"
+            scaled = run.rpartition("$")[2]
+            try:
+                yield float(scaled.replace(",", "")) * _MULTIPLIERS[unit.lower()]
+            except ValueError:
+                continue
+
 
-    return numbers
+def _extract_numbers(text: str) -> list[float]:
+    """Extract all numbers from text (see _iter_numbers)."""
+    return list(_iter_numbers(text))
 
 
-def _check_exact_number(answer: str, assertion: dict) -> AssertionResult:
+def _check_exact_number(ctx: AnswerContext, assertion: dict) -> AssertionResult:
     expected = float(assertion["value"])
-    numbers = _extract_numbers(answer)
+    numbers = ctx.numbers
     if expected in numbers:
         return AssertionResult(True, f"Found exact number {expected}")
     return AssertionResult(
@@ -64,23 +92,30 @@ def _check_exact_number(answer: str, assertion: dict) -> AssertionResult:
     )
 
 
-def _check_approx_number(answer: str, assertion: dict) -> AssertionResult:
+def _check_approx_number(ctx: AnswerContext, assertion: dict) -> AssertionResult:
     expected = float(assertion["value"])
     tolerance = float(assertion.get("tolerance", 0.01))
     relative = assertion.get("relative", False)
-    numbers = _extract_numbers(answer)
-
-    for n in numbers:
-        if relative:
-            if expected != 0 and abs(n - expected) / abs(expected) <= tolerance:
-                return AssertionResult(
-                    True, f"Found {n} within {tolerance * 100}% of {expected}"
-                )
-        else:
-            if abs(n - expected) <= tolerance:
-                return AssertionResult(
-                    True, f"Found {n} within +/-{tolerance} of {expected}"
-                )
+    numbers = ctx.numbers
+
+    # Pick the comparison once, then scan the numbers in a single generator pass
+    if relative:
+        scale = abs(expected)
+        match = None
+        if scale:
+            match = next(
+                (n for n in numbers if abs(n - expected) / scale <= tolerance), None
+            )
+        if match is not None:
+            return AssertionResult(
+                True, f"Found {match} within {tolerance * 100}% of {expected}"
+            )
+    else:
+        match = next((n for n in numbers if abs(n - expected) <= tolerance), None)
+        if match is not None:
+            return AssertionResult(
+                True, f"Found {match} within +/-{tolerance} of {expected}"
+            )
     return AssertionResult(
         False,
         f"No number within tolerance of {expected} "
@@ -88,10 +123,20 @@ def _check_approx_number(answer: str, assertion: dict) -> AssertionResult:
     )
 
 
-def _check_contains_all(answer: str, assertion: dict) -> AssertionResult:
+def _lowered_values(assertion: dict) -> tuple[str, ...]:
+    """Lowercased assertion values, computed once and stored on the assertion."""
+    lowered = assertion.get("_values_lower")
+    if lowered is None:
+        lowered = assertion["_values_lower"] = tuple(v.lower() for v in assertion["values"])
+    return lowered
+
+
+def _check_contains_all(ctx: AnswerContext, assertion: dict) -> AssertionResult:
     values = assertion["values"]
-    lower_answer = answer.lower()
-    missing = [v for v in values if v.lower() not in lower_answer]
+    lower_answer = ctx.lower
+    missing = [
+        v for v, lv in zip(values, _lowered_values(assertion)) if lv not in lower_answer
+    ]
     if not missing:
         return AssertionResult(True, f"Answer contains all of {values}")
     return AssertionResult(
@@ -99,22 +144,22 @@ def _check_contains_all(answer: str, assertion: dict) -> AssertionResult:
     )
 
 
-def _check_contains_any(answer: str, assertion: dict) -> AssertionResult:
+def _check_contains_any(ctx: AnswerContext, assertion: dict) -> AssertionResult:
     values = assertion["values"]
-    lower_answer = answer.lower()
-    found = [v for v in values if v.lower() in lower_answer]
+    lower_answer = ctx.lower
+    found = [v for v, lv in zip(values, _lowered_values(assertion)) if lv in lower_answer]
     if found:
         return AssertionResult(True, f"Answer contains: {found}")
     return AssertionResult(False, f"Answer contains none of {values}")
 
 
-def _check_ordered_list(answer: str, assertion: dict) -> AssertionResult:
+def _check_ordered_list(ctx: AnswerContext, assertion: dict) -> AssertionResult:
     """Check that items appear in the answer in the specified order."""
     values = assertion["values"]
-    lower_answer = answer.lower()
+    lower_answer = ctx.lower
     positions = []
-    for v in values:
-        pos = lower_answer.find(v.lower())
+    for v, lv in zip(values, _lowered_values(assertion)):
+        pos = lower_answer.find(lv)
         if pos == -1:
             return AssertionResult(
                 False, f"'{v}' not found in answer (checking order of {values})"
@@ -0,0 +1,20 @@
+"""Load evaluation cases from cases.yml."""
+
+import functools
+from pathlib import Path
+
+import yaml
+
+CASES_PATH = Path(__file__).parent / "cases.yml"
+
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@functools.lru_cache(maxsize=1)
+def load_cases() -> list[dict]:
+    """Parse cases.yml once per process; returns [] if the file is missing."""
+    if not CASES_PATH.exists():
+        return []
+    with open(CASES_PATH) as f:
+        data = yaml.load(f, Loader=_YamlLoader)
+    return data.get("cases", [])
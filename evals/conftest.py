@@ -5,7 +5,6 @@ import sys
 from pathlib import Path
 
 import pytest
-import yaml
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
@@ -38,11 +37,13 @@ def data_layer(db_path):
 
 
 @pytest.fixture(scope="session")
-def duckdb_conn(db_path):
-    """Raw DuckDB connection for running verification SQL."""
-    import duckdb
+def duckdb_conn(data_layer):
+    """Raw DuckDB cursor for running verification SQL.
 
-    conn = duckdb.connect(str(db_path), read_only=True)
+    A cursor on the DataLayer's read-only connection, so the warehouse is
+    opened once per session instead of once per fixture.
+    """
+    conn = data_layer.conn.cursor()
     yield conn
     conn.close()
 
@@ -69,14 +70,3 @@ def agent(data_layer, api_key):
     from astro.agent import Agent
 
     return Agent(data_layer, api_key, model="gemini-2.5-flash")
-
-
-@pytest.fixture(scope="session")
-def eval_cases() -> list[dict]:
-    """Load evaluation cases from cases.yml."""
-    cases_path = Path(__file__).parent / "cases.yml"
-    if not cases_path.exists():
-        pytest.fail(f"Evaluation cases file not found: {cases_path}")
-    with open(cases_path) as f:
-        data = yaml.safe_load(f)
-    return data["cases"]
@@ -5,20 +5,20 @@ Usage:
     pytest evals/ -v -k "revenue"       # run cases with 'revenue' in the id
     pytest evals/ -v -k "ground_truth"  # SQL-only validation (no API key)
     pytest evals/ -v --tb=short         # concise tracebacks
+    pytest evals/ -v -n 8               # spread cases over 8 xdist workers
+
+Each case is an independent agent session, so cases parallelize cleanly
+with pytest-xdist: every worker opens its own read-only DuckDB connection
+and DataLayer through the session-scoped fixtures and builds a fresh
+Agent per test.
 """
 
 import pytest
-import yaml
-from pathlib import Path
 
-from evals.assertions import check_assertion
+from evals.assertions import AnswerContext, check_assertion
+from evals.cases import load_cases
 
-_CASES_PATH = Path(__file__).parent / "cases.yml"
-_CASES = []
-if _CASES_PATH.exists():
-    with open(_CASES_PATH) as _f:
-        _data = yaml.safe_load(_f)
-        _CASES = _data.get("cases", [])
+_CASES = load_cases()
 
 
 def _case_id(case: dict) -> str:
@@ -36,8 +36,8 @@ def test_ground_truth_sql(case, duckdb_conn):
     if not verification_sql:
         pytest.skip("No verification SQL defined")
 
-    result = duckdb_conn.execute(verification_sql.strip()).fetchall()
-    assert len(result) > 0, f"Verification SQL returned no rows for case '{case.get('id')}'"
+    row = duckdb_conn.execute(verification_sql.strip()).fetchone()
+    assert row is not None, f"Verification SQL returned no rows for case '{case.get('id')}'"
 
 
 @pytest.mark.parametrize("case", _CASES, ids=[_case_id(c) for c in _CASES])
@@ -56,7 +56,8 @@ def test_agent_eval(case, agent, duckdb_conn):
     ground_truth = None
     if verification_sql:
         try:
-            ground_truth = duckdb_conn.execute(verification_sql.strip()).fetchall()
+            # Only shown in the failure message, so a few rows are enough
+            ground_truth = duckdb_conn.execute(verification_sql.strip()).fetchmany(10)
         except Exception as e:
             pytest.fail(
                 f"Verification SQL failed for '{case.get('id', '?')}': {e}\n"
@@ -68,16 +69,19 @@ def test_agent_eval(case, agent, duckdb_conn):
     sources = agent.get_sources()
 
     # Step 3: Validate assertions
+    answer_ctx = AnswerContext(answer)
     failures = []
-    for i, assertion in enumerate(assertions):
-        result = check_assertion(answer, assertion)
+    for i, assertion in enumerate(assertions, start=1):
+        result = check_assertion(answer_ctx, assertion)
         if not result.passed:
-            failures.append(
-                f"  Assertion #{i + 1} ({assertion['type']}): {result.message}"
-            )
+            failures.append((i, assertion, result))
 
     if failures:
-        detail = "\n".join(failures)
+        # Only format messages once we know the case failed
+        detail = "\n".join(
+            f"  Assertion #{i} ({assertion['type']}): {result.message}"
+            for i, assertion, result in failures
+        )
         pytest.fail(
             f"\nQuestion: {question}\n"
             f"Agent answer: {answer[:500]}\n"
@@ -1,12 +1,14 @@
 """
-Sync sources/sources.yml with the CSV files on disk.
+Sync sources/sources.yml with the CSV and Parquet files on disk.
 
-Scans sources/ for *.csv files, adds new ones to the manifest,
-and removes entries whose CSVs no longer exist.
+Scans sources/ for *.csv and *.parquet files, adds new ones to the
+manifest, and removes entries whose files no longer exist.
 
 Usage:
     uv run python scripts/sync_sources.py
 """
+import fnmatch
+import os
 from pathlib import Path
 
 import yaml
@@ -16,21 +18,50 @@ SOURCES_DIR = PROJECT_ROOT / "sources"
 MANIFEST_PATH = SOURCES_DIR / "sources.yml"
 DAG_FILE = PROJECT_ROOT / "airflow" / "dags" / "ingest_sources.py"
 
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# File extensions sync discovers, mapped to the manifest `format` they load with
+_DISCOVERED_FORMATS = {".csv": "csv", ".parquet": "parquet"}
+
+_MANIFEST_HEADER = (
+    "# Source manifest for the ingestion pipeline.\n"
+    "# To add a new source: place a CSV or Parquet file in sources/<system>/ and add\n"
+    "# an entry here, or run `just sync` to auto-discover CSV and Parquet files.\n\n"
+)
+
+
+def discover_sources() -> list[dict]:
+    """Walk sources/ and build entries for every CSV and Parquet file found."""
+    found = []
+
+    def walk(directory: str, rel_parts: tuple[str, ...]) -> None:
+        # DirEntry caches the file type, so no extra stat per entry
+        with os.scandir(directory) as it:
+            for entry in it:
+                parts = (*rel_parts, entry.name)
+                if entry.is_dir(follow_symlinks=False):
+                    walk(entry.path, parts)
+                elif os.path.splitext(entry.name)[1] in _DISCOVERED_FORMATS:
+                    found.append(parts)
+
+    walk(str(SOURCES_DIR), (SOURCES_DIR.name,))
+    found.sort()
 
-def discover_csvs() -> list[dict]:
-    """Walk sources/ and build entries for every CSV found."""
     entries = []
-    for csv_path in sorted(SOURCES_DIR.rglob("*.csv")):
-        rel_path = csv_path.relative_to(PROJECT_ROOT)
+    for parts in found:
         # Derive system from the first directory under sources/
         # e.g. sources/postgres/products.csv -> system="postgres"
-        system = rel_path.parts[1]
-        table = csv_path.stem
-        entries.append({
-            "table": table,
-            "path": str(rel_path),
-            "system": system,
-        })
+        stem, ext = os.path.splitext(parts[-1])
+        entry = {
+            "table": stem,
+            "path": os.path.join(*parts),
+            "system": parts[1],
+        }
+        # CSV is the manifest default, so only other formats are spelled out
+        if _DISCOVERED_FORMATS[ext] != "csv":
+            entry["format"] = _DISCOVERED_FORMATS[ext]
+        entries.append(entry)
     return entries
 
 
@@ -39,31 +70,54 @@ def load_manifest() -> list[dict]:
     if not MANIFEST_PATH.exists():
         return []
     with open(MANIFEST_PATH) as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=_YamlLoader)
     return data.get("sources", []) if data else []
 
 
 def save_manifest(sources: list[dict]) -> None:
     """Write the manifest file."""
-    with open(MANIFEST_PATH, "w") as f:
-        f.write(
-            "# Source manifest for the ingestion pipeline.\n"
-            "# To add a new source: place a CSV in sources/<system>/ and add an entry here,\n"
-            "# or run `just sync` to auto-discover CSVs.\n\n"
+    MANIFEST_PATH.write_text(
+        _MANIFEST_HEADER
+        + yaml.dump(
+            {"sources": sources},
+            Dumper=_YamlDumper,
+            default_flow_style=False,
+            sort_keys=False,
         )
-        yaml.dump({"sources": sources}, f, default_flow_style=False, sort_keys=False)
+    )
 
 
-def sync():
-    existing = load_manifest()
-    discovered = discover_csvs()
+def _covered_paths(entry: dict, discovered_by_path: dict[str, dict]) -> list[str]:
+    """Discovered file paths loaded by a manifest entry.
+
+    An entry's path is usually a single file, but may also be a glob or a
+    list of files (see the ingest DAG); those cover every file they match.
+    """
+    paths = entry["path"] if isinstance(entry["path"], list) else [entry["path"]]
+    covered = []
+    for path in paths:
+        if any(c in path for c in "*?["):
+            covered.extend(fnmatch.filter(discovered_by_path, path))
+        elif path in discovered_by_path:
+            covered.append(path)
+    return covered
 
-    existing_paths = {e["path"] for e in existing}
-    discovered_paths = {d["path"] for d in discovered}
 
-    added = [d for d in discovered if d["path"] not in existing_paths]
-    removed = [e for e in existing if e["path"] not in discovered_paths]
-    kept = [e for e in existing if e["path"] in discovered_paths]
+def sync():
+    existing = load_manifest()
+    discovered_by_path = {d["path"]: d for d in discover_sources()}
+
+    # One pass over the manifest: keep entries that still load at least one
+    # file on disk, and note which discovered files they account for
+    kept, removed, claimed = [], [], set()
+    for entry in existing:
+        covered = _covered_paths(entry, discovered_by_path)
+        if covered:
+            kept.append(entry)
+            claimed.update(covered)
+        else:
+            removed.append(entry)
+    added = [d for path, d in discovered_by_path.items() if path not in claimed]
 
     updated = kept + added
 
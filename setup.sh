@@ -35,6 +35,8 @@ if [ $? -eq 0 ]; then
 else
     echo "⚠️  Airflow initialization encountered an issue"
 fi
+# Pool for the ingest load tasks (one slot: DuckDB has a single writer per file)
+uv run airflow pools set ingest_csv 1 "DuckDB warehouse raw loads" > /dev/null
 echo ""
 
 # Step 3: Run ingestion DAGs